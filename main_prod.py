@@ -8,9 +8,15 @@ except ImportError:
 # Imports
 #
 
+import hashlib
 import json
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
 from openai import OpenAI
 
 from slack_sdk.web import WebClient
@@ -18,7 +24,7 @@ from slack_sdk.errors import SlackApiError
 from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
 from slack_bolt import App, Ack, BoltContext
 
-from app.bolt_listeners import register_listeners, before_authorize
+from app.bolt_listeners import register_listeners, before_authorize, just_ack
 from app.env import (
     USE_SLACK_LANGUAGE,
     SLACK_APP_LOG_LEVEL,
@@ -55,8 +61,12 @@ from app.i18n import translate
 #
 
 import boto3
+from botocore.exceptions import ClientError
 from slack_bolt.adapter.aws_lambda import SlackRequestHandler
 from slack_bolt.adapter.aws_lambda.lambda_s3_oauth_flow import LambdaS3OAuthFlow
+from slack_bolt.oauth.oauth_settings import OAuthSettings
+from slack_sdk.oauth.installation_store import Bot, Installation
+from slack_sdk.oauth.installation_store.amazon_s3 import AmazonS3InstallationStore
 
 SlackRequestHandler.clear_all_log_handlers()
 logging.basicConfig(format="%(asctime)s %(message)s", level=SLACK_APP_LOG_LEVEL)
@@ -67,58 +77,484 @@ openai_bucket_name = os.environ["OPENAI_S3_BUCKET_NAME"]
 client_template = WebClient()
 client_template.retry_handlers.append(RateLimitErrorRetryHandler(max_retry_count=2))
 
+# The OpenAI settings shared by all workspaces, which never change after startup
+_STATIC_OPENAI_CONTEXT = {
+    "OPENAI_API_TYPE": OPENAI_API_TYPE,
+    "OPENAI_API_BASE": OPENAI_API_BASE,
+    "OPENAI_API_VERSION": OPENAI_API_VERSION,
+    "OPENAI_DEPLOYMENT_ID": OPENAI_DEPLOYMENT_ID,
+    "OPENAI_ORG_ID": OPENAI_ORG_ID,
+    "OPENAI_FUNCTION_CALL_MODULE_NAME": OPENAI_FUNCTION_CALL_MODULE_NAME,
+}
+
+# The parsed OpenAI configuration per team_id; warm Lambda containers reuse this
+# to skip the S3 round-trip for every single Slack event. Once an entry expires,
+# it is revalidated with its ETag so that an unchanged object costs no body transfer.
+# The workspaces without any config are cached as None as well.
+OPENAI_CONFIG_CACHE_TTL_SECONDS = 60
+_openai_config_cache: Dict[str, Tuple[float, Optional[str], Optional[dict]]] = {}
+_openai_config_cache_lock = threading.Lock()
+
+
+def load_openai_config(team_id: Optional[str]) -> Optional[dict]:
+    if team_id is None:
+        # No workspace to load the config for (e.g., some org-level events)
+        return None
+    now = time.monotonic()
+    with _openai_config_cache_lock:
+        cached = _openai_config_cache.get(team_id)
+    if cached is not None and now - cached[0] < OPENAI_CONFIG_CACHE_TTL_SECONDS:
+        return cached[2]
+
+    try:
+        if cached is not None and cached[1] is not None:
+            s3_response = s3_client.get_object(
+                Bucket=openai_bucket_name, Key=team_id, IfNoneMatch=cached[1]
+            )
+        else:
+            s3_response = s3_client.get_object(Bucket=openai_bucket_name, Key=team_id)
+    except s3_client.exceptions.NoSuchKey:
+        # This workspace has not configured its OpenAI API key yet
+        with _openai_config_cache_lock:
+            _openai_config_cache[team_id] = (now, None, None)
+        return None
+    except ClientError as e:
+        if cached is not None and e.response.get("Error", {}).get("Code") in (
+            "304",
+            "NotModified",
+        ):
+            with _openai_config_cache_lock:
+                _openai_config_cache[team_id] = (now, cached[1], cached[2])
+            return cached[2]
+        raise
+
+    config_bytes: bytes = s3_response["Body"].read()
+    if config_bytes[:1] == b"{":
+        # json.loads accepts the UTF-8 bytes as-is
+        config = json.loads(config_bytes)
+        config = {
+            "api_key": config.get("api_key"),
+            "model": config.get("model"),
+            "image_generation_model": config.get(
+                "image_generation_model", OPENAI_IMAGE_GENERATION_MODEL
+            ),
+            "temperature": config.get("temperature", OPENAI_TEMPERATURE),
+        }
+    else:
+        # The legacy data format
+        config = {
+            "api_key": config_bytes.decode("utf-8"),
+            "model": OPENAI_MODEL,
+            "image_generation_model": OPENAI_IMAGE_GENERATION_MODEL,
+            "temperature": OPENAI_TEMPERATURE,
+        }
+    with _openai_config_cache_lock:
+        _openai_config_cache[team_id] = (now, s3_response["ETag"], config)
+    return config
+
+
+def invalidate_openai_config(team_id: Optional[str]):
+    with _openai_config_cache_lock:
+        _openai_config_cache.pop(team_id, None)
+
+
+# Successful API key + model validations, keyed by a hash of the pair so that
+# re-submitting the configure modal does not hit the OpenAI API again
+API_KEY_VALIDATION_CACHE_TTL_SECONDS = 300
+_api_key_validation_cache: Dict[str, float] = {}
+_api_key_validation_cache_lock = threading.Lock()
+
+
+def _api_key_validation_cache_key(api_key: str, model: str) -> str:
+    return hashlib.sha256((api_key + "|" + model).encode("utf-8")).hexdigest()
+
+
+def is_api_key_validated(api_key: str, model: str) -> bool:
+    key = _api_key_validation_cache_key(api_key, model)
+    with _api_key_validation_cache_lock:
+        validated_at = _api_key_validation_cache.get(key)
+    return (
+        validated_at is not None
+        and time.monotonic() - validated_at < API_KEY_VALIDATION_CACHE_TTL_SECONDS
+    )
+
+
+def save_api_key_validation(api_key: str, model: str):
+    key = _api_key_validation_cache_key(api_key, model)
+    with _api_key_validation_cache_lock:
+        _api_key_validation_cache[key] = time.monotonic()
+
+
+# OpenAI clients per API key (hashed), reused to keep their HTTP connection pools.
+# Only the clients for the keys that have passed the validation are kept here.
+OPENAI_CLIENT_CACHE_MAX_SIZE = 32
+_openai_clients: "OrderedDict[str, OpenAI]" = OrderedDict()
+_openai_clients_lock = threading.Lock()
+
+
+def find_openai_client(api_key: str) -> Optional[OpenAI]:
+    key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    with _openai_clients_lock:
+        client = _openai_clients.get(key)
+        if client is not None:
+            _openai_clients.move_to_end(key)
+        return client
+
+
+def save_openai_client(api_key: str, client: OpenAI):
+    key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    with _openai_clients_lock:
+        _openai_clients[key] = client
+        _openai_clients.move_to_end(key)
+        if len(_openai_clients) > OPENAI_CLIENT_CACHE_MAX_SIZE:
+            # Another thread may still be using the evicted client,
+            # so its connection pool is released when it's garbage-collected
+            _openai_clients.popitem(last=False)
+
+
+# A user's locale rarely changes, so it is kept for a long time to skip
+# the users.info API call on every Slack event
+LOCALE_CACHE_TTL_SECONDS = 24 * 60 * 60
+_locale_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+_locale_cache_lock = threading.Lock()
+
+
+# Runs the independent S3 deletions on uninstall events / token revocations concurrently
+revocation_executor = ThreadPoolExecutor(max_workers=16)
+
+
+def delete_openai_config(team_id: Optional[str], logger: logging.Logger):
+    try:
+        s3_client.delete_object(Bucket=openai_bucket_name, Key=team_id)
+        invalidate_openai_config(team_id)
+    except Exception as e:
+        logger.error(
+            f"Failed to delete an OpenAI auth key: (team_id: {team_id}, error: {e})"
+        )
+
+
+class CachedAmazonS3InstallationStore(AmazonS3InstallationStore):
+    """AmazonS3InstallationStore with a short-lived in-process cache for lookups.
+
+    Every Slack event is authorized by find_installation / find_bot, so warm Lambda
+    containers keep the found data for a while instead of reading S3 objects again.
+    The cached entries for a workspace are dropped whenever this store modifies it.
+    """
+
+    cache_ttl_seconds: int
+    _cache: Dict[
+        Tuple[Optional[str], Optional[str], str, Optional[str]], Tuple[float, Any]
+    ]
+
+    def __init__(self, *, cache_ttl_seconds: int = 60, **kwargs):
+        super().__init__(**kwargs)
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def _get_cached(self, key) -> Optional[Any]:
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl_seconds:
+            return cached[1]
+        return None
+
+    def _set_cached(self, key, value: Any):
+        if value is not None:
+            with self._cache_lock:
+                self._cache[key] = (time.monotonic(), value)
+
+    def _invalidate(self, enterprise_id: Optional[str], team_id: Optional[str]):
+        with self._cache_lock:
+            for key in list(self._cache.keys()):
+                # An org-wide installation (team_id: None) can be found through
+                # the lookups for any of its workspaces as well
+                if key[0] == enterprise_id and (
+                    team_id is None or key[1] in (team_id, None)
+                ):
+                    self._cache.pop(key, None)
+
+    # The cached entries are dropped after the write as well so that a lookup
+    # running concurrently with the write does not keep the old data for the TTL
+
+    def save(self, installation: Installation):
+        self._invalidate(installation.enterprise_id, installation.team_id)
+        try:
+            return super().save(installation)
+        finally:
+            self._invalidate(installation.enterprise_id, installation.team_id)
+
+    def save_bot(self, bot: Bot):
+        self._invalidate(bot.enterprise_id, bot.team_id)
+        try:
+            return super().save_bot(bot)
+        finally:
+            self._invalidate(bot.enterprise_id, bot.team_id)
+
+    def find_bot(
+        self,
+        *,
+        enterprise_id: Optional[str],
+        team_id: Optional[str],
+        is_enterprise_install: Optional[bool] = False,
+    ) -> Optional[Bot]:
+        key = (enterprise_id, None if is_enterprise_install else team_id, "bot", None)
+        bot = self._get_cached(key)
+        if bot is None:
+            bot = super().find_bot(
+                enterprise_id=enterprise_id,
+                team_id=team_id,
+                is_enterprise_install=is_enterprise_install,
+            )
+            self._set_cached(key, bot)
+        return bot
+
+    def find_installation(
+        self,
+        *,
+        enterprise_id: Optional[str],
+        team_id: Optional[str],
+        user_id: Optional[str] = None,
+        is_enterprise_install: Optional[bool] = False,
+    ) -> Optional[Installation]:
+        key = (
+            enterprise_id,
+            None if is_enterprise_install else team_id,
+            "installation",
+            user_id,
+        )
+        installation = self._get_cached(key)
+        if installation is None:
+            installation = super().find_installation(
+                enterprise_id=enterprise_id,
+                team_id=team_id,
+                user_id=user_id,
+                is_enterprise_install=is_enterprise_install,
+            )
+            self._set_cached(key, installation)
+        return installation
+
+    def delete_bot(self, *, enterprise_id: Optional[str], team_id: Optional[str]):
+        self._invalidate(enterprise_id, team_id)
+        try:
+            return super().delete_bot(enterprise_id=enterprise_id, team_id=team_id)
+        finally:
+            self._invalidate(enterprise_id, team_id)
+
+    def delete_installation(
+        self,
+        *,
+        enterprise_id: Optional[str],
+        team_id: Optional[str],
+        user_id: Optional[str] = None,
+    ):
+        self._invalidate(enterprise_id, team_id)
+        try:
+            return super().delete_installation(
+                enterprise_id=enterprise_id, team_id=team_id, user_id=user_id
+            )
+        finally:
+            self._invalidate(enterprise_id, team_id)
+
 
 def register_revocation_handlers(app: App):
     # Handle uninstall events and token revocations
-    @app.event("tokens_revoked")
     def handle_tokens_revoked_events(
         event: dict,
         context: BoltContext,
         logger: logging.Logger,
     ):
-        user_ids = event.get("tokens", {}).get("oauth", [])
-        if len(user_ids) > 0:
-            for user_id in user_ids:
-                app.installation_store.delete_installation(
+        futures = []
+        tokens = event.get("tokens") or {}
+        for user_id in tokens.get("oauth") or []:
+            futures.append(
+                revocation_executor.submit(
+                    app.installation_store.delete_installation,
                     enterprise_id=context.enterprise_id,
                     team_id=context.team_id,
                     user_id=user_id,
                 )
-        bots = event.get("tokens", {}).get("bot", [])
-        if len(bots) > 0:
-            app.installation_store.delete_bot(
-                enterprise_id=context.enterprise_id,
-                team_id=context.team_id,
             )
-            try:
-                s3_client.delete_object(Bucket=openai_bucket_name, Key=context.team_id)
-            except Exception as e:
-                logger.error(
-                    f"Failed to delete an OpenAI auth key: (team_id: {context.team_id}, error: {e})"
+        if tokens.get("bot"):
+            futures.append(
+                revocation_executor.submit(
+                    app.installation_store.delete_bot,
+                    enterprise_id=context.enterprise_id,
+                    team_id=context.team_id,
+                )
+            )
+            futures.append(
+                revocation_executor.submit(
+                    delete_openai_config, context.team_id, logger
                 )
+            )
+        for future in futures:
+            # Surface the errors from the installation store as before
+            future.result()
 
-    @app.event("app_uninstalled")
     def handle_app_uninstalled_events(
         context: BoltContext,
         logger: logging.Logger,
     ):
-        app.installation_store.delete_all(
-            enterprise_id=context.enterprise_id,
-            team_id=context.team_id,
+        futures = [
+            revocation_executor.submit(
+                app.installation_store.delete_all,
+                enterprise_id=context.enterprise_id,
+                team_id=context.team_id,
+            ),
+            revocation_executor.submit(delete_openai_config, context.team_id, logger),
+        ]
+        for future in futures:
+            future.result()
+
+    # The deletions run as lazy listeners so that they never delay the ack response
+    app.event("tokens_revoked")(ack=just_ack, lazy=[handle_tokens_revoked_events])
+    app.event("app_uninstalled")(ack=just_ack, lazy=[handle_app_uninstalled_events])
+
+
+def set_locale(
+    context: BoltContext,
+    client: WebClient,
+    logger: logging.Logger,
+    next_,
+):
+    bot_scopes = context.authorize_result.bot_scopes
+    if bot_scopes is not None and "users:read" in bot_scopes:
+        user_id = context.actor_user_id or context.user_id
+        now = time.monotonic()
+        with _locale_cache_lock:
+            cached = _locale_cache.get(user_id)
+        if cached is not None and now - cached[0] < LOCALE_CACHE_TTL_SECONDS:
+            context["locale"] = cached[1]
+        else:
+            try:
+                user_info = client.users_info(user=user_id, include_locale=True)
+                locale = user_info.get("user", {}).get("locale")
+                with _locale_cache_lock:
+                    _locale_cache[user_id] = (now, locale)
+                context["locale"] = locale
+            except SlackApiError as e:
+                logger.debug(f"Failed to fetch user info due to {e}")
+                pass
+    next_()
+
+
+def set_s3_openai_api_key(context: BoltContext, logger: logging.Logger, next_):
+    config: Optional[dict] = None
+    try:
+        # None if this workspace has not configured its OpenAI API key yet
+        config = load_openai_config(context.team_id)
+    except Exception as e:
+        # Other S3 errors must not abort the listeners (e.g., uninstallation cleanup)
+        logger.exception(
+            f"Failed to load an OpenAI auth key: (team_id: {context.team_id}, error: {e})"
         )
+
+    if config is not None:
+        context["OPENAI_CONFIG_PRESENT"] = True
+        context["OPENAI_API_KEY"] = config["api_key"]
+        context["OPENAI_MODEL"] = config["model"]
+        context["OPENAI_IMAGE_GENERATION_MODEL"] = config["image_generation_model"]
+        context["OPENAI_TEMPERATURE"] = config["temperature"]
+    else:
+        context["OPENAI_CONFIG_PRESENT"] = False
+        context["OPENAI_API_KEY"] = None
+        context["OPENAI_MODEL"] = None
+        context["OPENAI_IMAGE_GENERATION_MODEL"] = None
+        context["OPENAI_TEMPERATURE"] = None
+
+    context.update(_STATIC_OPENAI_CONTEXT)
+    next_()
+
+
+def verify_api_key(api_key: str, model: str) -> Optional[str]:
+    """Returns the name of the invalid input ("api_key" or "model") if the pair doesn't work."""
+    if is_api_key_validated(api_key, model):
+        return None
+    client = find_openai_client(api_key) or OpenAI(api_key=api_key)
+    try:
+        # Verify if the API key is valid; listing the models also tells
+        # which ones are available for the key in a single round-trip
+        available_models = {m.id for m in client.models.list().data}
+    except Exception:
+        return "api_key"
+    # Verify if the given model works with the API key
+    if model not in available_models:
+        return "model"
+    save_api_key_validation(api_key, model)
+    save_openai_client(api_key, client)
+    return None
+
+
+def validate_api_key_registration(ack: Ack, view: dict, context: BoltContext):
+    already_set_api_key = context.get("OPENAI_API_KEY")
+
+    inputs = view["state"]["values"]
+    api_key = inputs["api_key"]["input"]["value"]
+    model = inputs["model"]["input"]["selected_option"]["value"]
+    invalid_input = verify_api_key(api_key, model)
+    if invalid_input is None:
+        ack()
+        return
+
+    if invalid_input == "api_key":
+        text = "This API key seems to be invalid"
+    else:
+        text = "This model is not yet available for this API key"
+    if already_set_api_key is not None:
+        text = translate(openai_api_key=already_set_api_key, context=context, text=text)
+    ack(
+        response_action="errors",
+        errors={invalid_input: text},
+    )
+
+
+def save_api_key_registration(
+    view: dict,
+    logger: logging.Logger,
+    context: BoltContext,
+):
+    inputs = view["state"]["values"]
+    api_key = inputs["api_key"]["input"]["value"]
+    model = inputs["model"]["input"]["selected_option"]["value"]
+    # Lazy listeners run even when the ack handler has rejected the submission,
+    # so the pair must be verified again here. On AWS Lambda, this runs in
+    # a separate invocation, which rarely shares the ack handler's validation cache.
+    if not is_api_key_validated(api_key, model):
         try:
-            s3_client.delete_object(Bucket=openai_bucket_name, Key=context.team_id)
+            # A single small request verifies both the API key and the model
+            client = find_openai_client(api_key) or OpenAI(api_key=api_key)
+            client.models.retrieve(model=model)
         except Exception as e:
-            logger.error(
-                f"Failed to delete an OpenAI auth key: (team_id: {context.team_id}, error: {e})"
+            logger.info(
+                f"Skipped saving an invalid OpenAI API key / model (team_id: {context.team_id}, error: {e})"
             )
+            return
+    try:
+        s3_client.put_object(
+            Bucket=openai_bucket_name,
+            Key=context.team_id,
+            Body=json.dumps({"api_key": api_key, "model": model}),
+            ContentType="application/json",
+        )
+        invalidate_openai_config(context.team_id)
+    except Exception as e:
+        logger.exception(e)
 
 
-def handler(event, context_):
+def create_app() -> App:
     app = App(
         process_before_response=True,
         before_authorize=before_authorize,
-        oauth_flow=LambdaS3OAuthFlow(),
+        oauth_flow=LambdaS3OAuthFlow(
+            settings=OAuthSettings(
+                installation_store=CachedAmazonS3InstallationStore(
+                    s3_client=s3_client,
+                    bucket_name=os.environ["SLACK_INSTALLATION_S3_BUCKET_NAME"],
+                    client_id=os.environ["SLACK_CLIENT_ID"],
+                ),
+            ),
+        ),
         client=client_template,
     )
     app.oauth_flow.settings.install_page_rendering_enabled = False
@@ -126,61 +562,9 @@ def handler(event, context_):
     register_revocation_handlers(app)
 
     if USE_SLACK_LANGUAGE is True:
+        app.middleware(set_locale)
 
-        @app.middleware
-        def set_locale(
-            context: BoltContext,
-            client: WebClient,
-            logger: logging.Logger,
-            next_,
-        ):
-            bot_scopes = context.authorize_result.bot_scopes
-            if bot_scopes is not None and "users:read" in bot_scopes:
-                user_id = context.actor_user_id or context.user_id
-                try:
-                    user_info = client.users_info(user=user_id, include_locale=True)
-                    context["locale"] = user_info.get("user", {}).get("locale")
-                except SlackApiError as e:
-                    logger.debug(f"Failed to fetch user info due to {e}")
-                    pass
-            next_()
-
-    @app.middleware
-    def set_s3_openai_api_key(context: BoltContext, next_):
-        try:
-            s3_response = s3_client.get_object(
-                Bucket=openai_bucket_name, Key=context.team_id
-            )
-            config_str: str = s3_response["Body"].read().decode("utf-8")
-            if config_str.startswith("{"):
-                config = json.loads(config_str)
-                context["OPENAI_API_KEY"] = config.get("api_key")
-                context["OPENAI_MODEL"] = config.get("model")
-                context["OPENAI_IMAGE_GENERATION_MODEL"] = config.get(
-                    "image_generation_model", OPENAI_IMAGE_GENERATION_MODEL
-                )
-                context["OPENAI_TEMPERATURE"] = config.get(
-                    "temperature", OPENAI_TEMPERATURE
-                )
-            else:
-                # The legacy data format
-                context["OPENAI_API_KEY"] = config_str
-                context["OPENAI_MODEL"] = OPENAI_MODEL
-                context["OPENAI_IMAGE_GENERATION_MODEL"] = OPENAI_IMAGE_GENERATION_MODEL
-                context["OPENAI_TEMPERATURE"] = OPENAI_TEMPERATURE
-        except:  # noqa: E722
-            context["OPENAI_API_KEY"] = None
-            context["OPENAI_MODEL"] = None
-            context["OPENAI_IMAGE_GENERATION_MODEL"] = None
-            context["OPENAI_TEMPERATURE"] = None
-
-        context["OPENAI_API_TYPE"] = OPENAI_API_TYPE
-        context["OPENAI_API_BASE"] = OPENAI_API_BASE
-        context["OPENAI_API_VERSION"] = OPENAI_API_VERSION
-        context["OPENAI_DEPLOYMENT_ID"] = OPENAI_DEPLOYMENT_ID
-        context["OPENAI_ORG_ID"] = OPENAI_ORG_ID
-        context["OPENAI_FUNCTION_CALL_MODULE_NAME"] = OPENAI_FUNCTION_CALL_MODULE_NAME
-        next_()
+    app.middleware(set_s3_openai_api_key)
 
     #
     # Home tab rendering
@@ -189,11 +573,9 @@ def handler(event, context_):
     @app.event("app_home_opened")
     def render_home_tab(client: WebClient, context: BoltContext):
         message = DEFAULT_HOME_TAB_MESSAGE
-        try:
-            s3_client.get_object(Bucket=openai_bucket_name, Key=context.team_id)
+        # set_s3_openai_api_key has already loaded the config for this request
+        if context.get("OPENAI_CONFIG_PRESENT") is True:
             message = "This app is ready to use in this workspace :raised_hands:"
-        except:  # noqa: E722
-            pass
         openai_api_key = context.get("OPENAI_API_KEY")
         client.views_publish(
             user_id=context.user_id,
@@ -218,68 +600,21 @@ def handler(event, context_):
             view=build_configure_modal(context),
         )
 
-    def validate_api_key_registration(ack: Ack, view: dict, context: BoltContext):
-        already_set_api_key = context.get("OPENAI_API_KEY")
-
-        inputs = view["state"]["values"]
-        api_key = inputs["api_key"]["input"]["value"]
-        model = inputs["model"]["input"]["selected_option"]["value"]
-        try:
-            # Verify if the API key is valid
-            client = OpenAI(api_key=api_key)
-            client.models.retrieve(model="gpt-3.5-turbo")
-            try:
-                # Verify if the given model works with the API key
-                client.models.retrieve(model=model)
-            except Exception:
-                text = "This model is not yet available for this API key"
-                if already_set_api_key is not None:
-                    text = translate(
-                        openai_api_key=already_set_api_key, context=context, text=text
-                    )
-                ack(
-                    response_action="errors",
-                    errors={"model": text},
-                )
-                return
-            ack()
-        except Exception:
-            text = "This API key seems to be invalid"
-            if already_set_api_key is not None:
-                text = translate(
-                    openai_api_key=already_set_api_key, context=context, text=text
-                )
-            ack(
-                response_action="errors",
-                errors={"api_key": text},
-            )
-
-    def save_api_key_registration(
-        view: dict,
-        logger: logging.Logger,
-        context: BoltContext,
-    ):
-        inputs = view["state"]["values"]
-        api_key = inputs["api_key"]["input"]["value"]
-        model = inputs["model"]["input"]["selected_option"]["value"]
-        try:
-            client = OpenAI(api_key=api_key)
-            client.models.retrieve(model=model)
-            s3_client.put_object(
-                Bucket=openai_bucket_name,
-                Key=context.team_id,
-                Body=json.dumps({"api_key": api_key, "model": model}),
-            )
-        except Exception as e:
-            logger.exception(e)
-
     app.view("configure")(
         ack=validate_api_key_registration,
         lazy=[save_api_key_registration],
     )
 
-    #
-    # Handle an AWS Lambda event
-    #
-    slack_handler = SlackRequestHandler(app=app)
+    return app
+
+
+# Built once per Lambda container so that warm invocations reuse the app,
+# its OAuth flow / installation store, and the registered listeners
+slack_handler = SlackRequestHandler(app=create_app())
+
+
+#
+# Handle an AWS Lambda event
+#
+def handler(event, context_):
     return slack_handler.handle(event, context_)
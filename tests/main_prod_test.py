@@ -0,0 +1,693 @@
+import io
+import logging
+import os
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+from slack_bolt import BoltContext, BoltRequest, BoltResponse
+from slack_bolt.authorization import AuthorizeResult
+from slack_sdk.errors import SlackApiError
+from slack_sdk.oauth.installation_store import Installation
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("OPENAI_S3_BUCKET_NAME", "openai-bucket")
+os.environ.setdefault("SLACK_CLIENT_ID", "111.222")
+os.environ.setdefault("SLACK_CLIENT_SECRET", "client-secret")
+os.environ.setdefault("SLACK_SIGNING_SECRET", "signing-secret")
+os.environ.setdefault("SLACK_INSTALLATION_S3_BUCKET_NAME", "installation-bucket")
+os.environ.setdefault("SLACK_STATE_S3_BUCKET_NAME", "state-bucket")
+
+import main_prod  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.put_object_calls = []
+
+        self.delete_object_calls = []
+
+    def put_object(self, **kwargs):
+        self.put_object_calls.append(kwargs)
+
+    def delete_object(self, **kwargs):
+        self.delete_object_calls.append(kwargs)
+
+
+class FakeOpenAI:
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.models = SimpleNamespace(
+            list=self._list_models, retrieve=self._retrieve_model
+        )
+        self.list_models_count = 0
+        self.retrieve_model_count = 0
+
+    def _list_models(self):
+        self.list_models_count += 1
+        if self.api_key != "sk-valid":
+            raise Exception("Incorrect API key provided")
+        return SimpleNamespace(data=[SimpleNamespace(id="gpt-4o")])
+
+    def _retrieve_model(self, model: str):
+        self.retrieve_model_count += 1
+        if self.api_key != "sk-valid":
+            raise Exception("Incorrect API key provided")
+        if model != "gpt-4o":
+            raise Exception(f"The model `{model}` does not exist")
+        return SimpleNamespace(id=model)
+
+
+@pytest.fixture(autouse=True)
+def reset_caches(monkeypatch):
+    monkeypatch.setattr(main_prod, "OpenAI", FakeOpenAI)
+    main_prod._openai_config_cache.clear()
+    main_prod._api_key_validation_cache.clear()
+    main_prod._openai_clients.clear()
+    main_prod._locale_cache.clear()
+    yield
+
+
+def build_get_object_response(body: bytes, etag: str = '"etag-1"') -> dict:
+    return {"Body": StreamingBody(io.BytesIO(body), len(body)), "ETag": etag}
+
+
+def test_load_openai_config_cache_hit():
+    with Stubber(main_prod.s3_client) as stubber:
+        stubber.add_response(
+            "get_object",
+            build_get_object_response(b'{"api_key": "sk-valid", "model": "gpt-4o"}'),
+            {"Bucket": "openai-bucket", "Key": "T111"},
+        )
+        config = main_prod.load_openai_config("T111")
+        assert config["api_key"] == "sk-valid"
+        assert config["model"] == "gpt-4o"
+        assert config["temperature"] == main_prod.OPENAI_TEMPERATURE
+        # The second call within the TTL must not access S3
+        assert main_prod.load_openai_config("T111") == config
+        stubber.assert_no_pending_responses()
+
+
+def test_load_openai_config_cache_miss_after_ttl(monkeypatch):
+    monkeypatch.setattr(main_prod, "OPENAI_CONFIG_CACHE_TTL_SECONDS", -1)
+    with Stubber(main_prod.s3_client) as stubber:
+        stubber.add_response(
+            "get_object",
+            build_get_object_response(b'{"api_key": "sk-old", "model": "gpt-4o"}'),
+            {"Bucket": "openai-bucket", "Key": "T111"},
+        )
+        stubber.add_response(
+            "get_object",
+            build_get_object_response(
+                b'{"api_key": "sk-new", "model": "gpt-4o"}', '"etag-2"'
+            ),
+            {"Bucket": "openai-bucket", "Key": "T111", "IfNoneMatch": '"etag-1"'},
+        )
+        assert main_prod.load_openai_config("T111")["api_key"] == "sk-old"
+        assert main_prod.load_openai_config("T111")["api_key"] == "sk-new"
+        stubber.assert_no_pending_responses()
+
+
+def test_load_openai_config_not_modified(monkeypatch):
+    monkeypatch.setattr(main_prod, "OPENAI_CONFIG_CACHE_TTL_SECONDS", -1)
+    with Stubber(main_prod.s3_client) as stubber:
+        stubber.add_response(
+            "get_object",
+            build_get_object_response(b'{"api_key": "sk-valid", "model": "gpt-4o"}'),
+            {"Bucket": "openai-bucket", "Key": "T111"},
+        )
+        stubber.add_client_error(
+            "get_object",
+            service_error_code="304",
+            http_status_code=304,
+            expected_params={
+                "Bucket": "openai-bucket",
+                "Key": "T111",
+                "IfNoneMatch": '"etag-1"',
+            },
+        )
+        config = main_prod.load_openai_config("T111")
+        assert main_prod.load_openai_config("T111") == config
+        stubber.assert_no_pending_responses()
+    assert main_prod._openai_config_cache["T111"][1] == '"etag-1"'
+
+
+def test_load_openai_config_legacy_format():
+    with Stubber(main_prod.s3_client) as stubber:
+        stubber.add_response(
+            "get_object",
+            build_get_object_response(b"sk-legacy"),
+            {"Bucket": "openai-bucket", "Key": "T111"},
+        )
+        config = main_prod.load_openai_config("T111")
+        assert config["api_key"] == "sk-legacy"
+        assert config["model"] == main_prod.OPENAI_MODEL
+        assert (
+            config["image_generation_model"] == main_prod.OPENAI_IMAGE_GENERATION_MODEL
+        )
+
+
+@pytest.mark.parametrize(
+    "service_error_code, team_id, logged",
+    [
+        ("NoSuchKey", "T111", False),
+        ("SlowDown", "T111", True),
+        ("InternalError", "T111", True),
+        (None, None, False),
+    ],
+)
+def test_set_s3_openai_api_key_errors(caplog, service_error_code, team_id, logged):
+    context = BoltContext({"team_id": team_id})
+    next_calls = []
+    with Stubber(main_prod.s3_client) as stubber:
+        if service_error_code is not None:
+            stubber.add_client_error(
+                "get_object", service_error_code=service_error_code
+            )
+        # team_id: None skips the lookup without any request
+        main_prod.set_s3_openai_api_key(
+            context=context, logger=logger, next_=lambda: next_calls.append(True)
+        )
+        stubber.assert_no_pending_responses()
+    assert next_calls == [True]
+    assert context["OPENAI_CONFIG_PRESENT"] is False
+    assert context["OPENAI_API_KEY"] is None
+    assert context["OPENAI_API_BASE"] == main_prod.OPENAI_API_BASE
+    assert ("Failed to load an OpenAI auth key" in caplog.text) is logged
+
+
+def test_load_openai_config_not_configured():
+    with Stubber(main_prod.s3_client) as stubber:
+        stubber.add_client_error("get_object", service_error_code="NoSuchKey")
+        assert main_prod.load_openai_config("T111") is None
+        # The negative result is cached as well
+        assert main_prod.load_openai_config("T111") is None
+        stubber.assert_no_pending_responses()
+
+    main_prod.invalidate_openai_config("T111")
+    with Stubber(main_prod.s3_client) as stubber:
+        stubber.add_response(
+            "get_object",
+            build_get_object_response(b'{"api_key": "sk-valid", "model": "gpt-4o"}'),
+            {"Bucket": "openai-bucket", "Key": "T111"},
+        )
+        assert main_prod.load_openai_config("T111")["api_key"] == "sk-valid"
+        stubber.assert_no_pending_responses()
+
+
+def test_load_openai_config_not_configured_after_ttl(monkeypatch):
+    monkeypatch.setattr(main_prod, "OPENAI_CONFIG_CACHE_TTL_SECONDS", -1)
+    with Stubber(main_prod.s3_client) as stubber:
+        stubber.add_client_error("get_object", service_error_code="NoSuchKey")
+        stubber.add_response(
+            "get_object",
+            build_get_object_response(b'{"api_key": "sk-valid", "model": "gpt-4o"}'),
+            # No IfNoneMatch for a negative result
+            {"Bucket": "openai-bucket", "Key": "T111"},
+        )
+        assert main_prod.load_openai_config("T111") is None
+        assert main_prod.load_openai_config("T111")["api_key"] == "sk-valid"
+        stubber.assert_no_pending_responses()
+
+
+def test_load_openai_config_without_team_id():
+    with Stubber(main_prod.s3_client) as stubber:
+        assert main_prod.load_openai_config(None) is None
+        stubber.assert_no_pending_responses()
+    assert main_prod._openai_config_cache == {}
+
+
+def test_openai_config_invalidation(monkeypatch):
+    s3_client = FakeS3Client()
+    monkeypatch.setattr(main_prod, "s3_client", s3_client)
+    cached = (0.0, '"etag-1"', {"api_key": "sk-old"})
+
+    main_prod._openai_config_cache["T111"] = cached
+    main_prod.save_api_key_registration(
+        view=build_view("sk-valid", "gpt-4o"),
+        logger=logger,
+        context=BoltContext({"team_id": "T111"}),
+    )
+    assert "T111" not in main_prod._openai_config_cache
+
+    main_prod._openai_config_cache["T111"] = cached
+    main_prod.delete_openai_config("T111", logger)
+    assert s3_client.delete_object_calls == [{"Bucket": "openai-bucket", "Key": "T111"}]
+    assert "T111" not in main_prod._openai_config_cache
+
+
+class InMemoryS3Client:
+    def __init__(self):
+        self.objects = {}
+        self.get_object_count = 0
+
+    def get_object(self, *, Bucket: str, Key: str):
+        self.get_object_count += 1
+        if Key not in self.objects:
+            raise Exception(f"NoSuchKey: {Key}")
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def put_object(self, *, Bucket: str, Key: str, Body: str):
+        self.objects[Key] = Body.encode("utf-8")
+
+    def list_objects(self, *, Bucket: str, Prefix: str, MaxKeys: int = 1000):
+        keys = [k for k in self.objects.keys() if k.startswith(Prefix)][:MaxKeys]
+        return {"Contents": [{"Key": k} for k in keys]}
+
+    def delete_object(self, *, Bucket: str, Key: str):
+        self.objects.pop(Key, None)
+
+
+def build_installation_store(
+    cache_ttl_seconds: int = 60, s3_client: Optional[InMemoryS3Client] = None
+):
+    s3_client = s3_client or InMemoryS3Client()
+    store = main_prod.CachedAmazonS3InstallationStore(
+        s3_client=s3_client,
+        bucket_name="installation-bucket",
+        client_id="111.222",
+        historical_data_enabled=False,
+        cache_ttl_seconds=cache_ttl_seconds,
+    )
+    return store, s3_client
+
+
+def build_installation(
+    enterprise_id: Optional[str] = None,
+    team_id: Optional[str] = "T111",
+    bot_token: str = "xoxb-1",
+) -> Installation:
+    return Installation(
+        app_id="A111",
+        enterprise_id=enterprise_id,
+        team_id=team_id,
+        user_id="U111",
+        bot_token=bot_token,
+        bot_id="B111",
+        bot_user_id="W111",
+        bot_scopes=["chat:write"],
+        is_enterprise_install=team_id is None,
+    )
+
+
+def test_installation_store_cache_hit():
+    store, s3_client = build_installation_store()
+    store.save(build_installation())
+    assert store.find_bot(enterprise_id=None, team_id="T111").bot_token == "xoxb-1"
+    assert store.find_bot(enterprise_id=None, team_id="T111").bot_token == "xoxb-1"
+    assert s3_client.get_object_count == 1
+    installation = store.find_installation(enterprise_id=None, team_id="T111")
+    assert installation.bot_token == "xoxb-1"
+    store.find_installation(enterprise_id=None, team_id="T111")
+    assert s3_client.get_object_count == 2
+
+
+def test_installation_store_none_is_not_cached():
+    store, s3_client = build_installation_store()
+    assert store.find_bot(enterprise_id=None, team_id="T111") is None
+    assert store.find_installation(enterprise_id=None, team_id="T111") is None
+    # Saved by another container, so this store's invalidation doesn't run
+    another_store, _ = build_installation_store(s3_client=s3_client)
+    another_store.save(build_installation())
+    assert store.find_bot(enterprise_id=None, team_id="T111") is not None
+    assert store.find_installation(enterprise_id=None, team_id="T111") is not None
+
+
+def test_installation_store_ttl():
+    store, s3_client = build_installation_store(cache_ttl_seconds=-1)
+    store.save(build_installation())
+    store.find_bot(enterprise_id=None, team_id="T111")
+    store.find_bot(enterprise_id=None, team_id="T111")
+    assert s3_client.get_object_count == 2
+
+
+def test_installation_store_invalidation_on_save():
+    store, _ = build_installation_store()
+    store.save(build_installation(bot_token="xoxb-1"))
+    store.find_bot(enterprise_id=None, team_id="T111")
+    store.find_installation(enterprise_id=None, team_id="T111")
+    store.save(build_installation(bot_token="xoxb-2"))
+    assert store.find_bot(enterprise_id=None, team_id="T111").bot_token == "xoxb-2"
+    installation = store.find_installation(enterprise_id=None, team_id="T111")
+    assert installation.bot_token == "xoxb-2"
+
+
+def test_installation_store_invalidation_on_delete():
+    store, _ = build_installation_store()
+    store.save(build_installation(team_id="T111"))
+    store.save(build_installation(team_id="T222"))
+    for team_id in ["T111", "T222"]:
+        store.find_bot(enterprise_id=None, team_id=team_id)
+        store.find_installation(enterprise_id=None, team_id=team_id)
+        store.find_installation(enterprise_id=None, team_id=team_id, user_id="U111")
+
+    store.delete_bot(enterprise_id=None, team_id="T111")
+    assert store.find_bot(enterprise_id=None, team_id="T111") is None
+    store.delete_installation(enterprise_id=None, team_id="T111")
+    assert store.find_installation(enterprise_id=None, team_id="T111") is None
+    assert (
+        store.find_installation(enterprise_id=None, team_id="T111", user_id="U111")
+        is None
+    )
+    # The other workspace's entries must be left as-is
+    assert len([k for k in store._cache.keys() if k[1] == "T222"]) == 3
+
+
+def test_installation_store_invalidation_for_org_wide_installation():
+    store, _ = build_installation_store()
+    store.save(build_installation(enterprise_id="E111", team_id="T111"))
+    store.save(build_installation(enterprise_id="E111", team_id=None))
+    store.find_bot(enterprise_id="E111", team_id="T111")
+    store.find_installation(enterprise_id="E111", team_id="T111")
+    store.find_bot(enterprise_id="E111", team_id=None, is_enterprise_install=True)
+    store.delete_installation(enterprise_id="E111", team_id=None)
+    assert [k for k in store._cache.keys() if k[0] == "E111"] == []
+
+
+class ConcurrentLookupS3Client(InMemoryS3Client):
+    """Runs a lookup before each write lands, as another thread could do."""
+
+    def __init__(self):
+        super().__init__()
+        self.on_write = None
+
+    def put_object(self, **kwargs):
+        if self.on_write is not None:
+            self.on_write()
+        super().put_object(**kwargs)
+
+    def delete_object(self, **kwargs):
+        if self.on_write is not None:
+            self.on_write()
+        super().delete_object(**kwargs)
+
+
+def test_installation_store_concurrent_lookup_during_write():
+    s3_client = ConcurrentLookupS3Client()
+    store, _ = build_installation_store(s3_client=s3_client)
+    store.save(build_installation(bot_token="xoxb-1"))
+    store.find_bot(enterprise_id=None, team_id="T111")
+
+    s3_client.on_write = lambda: store.find_bot(enterprise_id=None, team_id="T111")
+    store.save(build_installation(bot_token="xoxb-2"))
+    assert store.find_bot(enterprise_id=None, team_id="T111").bot_token == "xoxb-2"
+
+    store.delete_bot(enterprise_id=None, team_id="T111")
+    assert store.find_bot(enterprise_id=None, team_id="T111") is None
+
+
+def build_view(api_key: str, model: str) -> dict:
+    return {
+        "state": {
+            "values": {
+                "api_key": {"input": {"value": api_key}},
+                "model": {"input": {"selected_option": {"value": model}}},
+            }
+        }
+    }
+
+
+def test_save_api_key_registration_valid_key(monkeypatch):
+    s3_client = FakeS3Client()
+    monkeypatch.setattr(main_prod, "s3_client", s3_client)
+    main_prod.save_api_key_registration(
+        view=build_view("sk-valid", "gpt-4o"),
+        logger=logger,
+        context=BoltContext({"team_id": "T111"}),
+    )
+    assert len(s3_client.put_object_calls) == 1
+    assert s3_client.put_object_calls[0]["Key"] == "T111"
+
+
+def test_save_api_key_registration_openai_requests(monkeypatch):
+    monkeypatch.setattr(main_prod, "s3_client", FakeS3Client())
+    clients = []
+
+    def build_openai_client(api_key: str):
+        clients.append(FakeOpenAI(api_key))
+        return clients[-1]
+
+    monkeypatch.setattr(main_prod, "OpenAI", build_openai_client)
+    # A cache miss, as on a different Lambda container from the ack handler
+    main_prod.save_api_key_registration(
+        view=build_view("sk-valid", "gpt-4o"),
+        logger=logger,
+        context=BoltContext({"team_id": "T111"}),
+    )
+    assert [(c.list_models_count, c.retrieve_model_count) for c in clients] == [(0, 1)]
+
+    # A cache hit does not need any OpenAI requests
+    clients.clear()
+    main_prod.save_api_key_validation("sk-valid", "gpt-4o")
+    main_prod.save_api_key_registration(
+        view=build_view("sk-valid", "gpt-4o"),
+        logger=logger,
+        context=BoltContext({"team_id": "T111"}),
+    )
+    assert clients == []
+
+
+@pytest.mark.parametrize(
+    "api_key, model",
+    [
+        ("sk-invalid", "gpt-4o"),
+        ("sk-valid", "gpt-unavailable"),
+    ],
+)
+def test_save_api_key_registration_invalid_input(monkeypatch, api_key, model):
+    s3_client = FakeS3Client()
+    monkeypatch.setattr(main_prod, "s3_client", s3_client)
+    main_prod.save_api_key_registration(
+        view=build_view(api_key, model),
+        logger=logger,
+        context=BoltContext({"team_id": "T111"}),
+    )
+    assert s3_client.put_object_calls == []
+    assert main_prod.find_openai_client(api_key) is None
+
+
+def test_validate_api_key_registration_errors():
+    acks = []
+    main_prod.validate_api_key_registration(
+        ack=lambda **kwargs: acks.append(kwargs),
+        view=build_view("sk-invalid", "gpt-4o"),
+        context=BoltContext(),
+    )
+    assert list(acks[0]["errors"].keys()) == ["api_key"]
+    assert main_prod.find_openai_client("sk-invalid") is None
+
+    acks = []
+    main_prod.validate_api_key_registration(
+        ack=lambda **kwargs: acks.append(kwargs),
+        view=build_view("sk-valid", "gpt-4o"),
+        context=BoltContext(),
+    )
+    assert acks == [{}]
+    assert main_prod.is_api_key_validated("sk-valid", "gpt-4o")
+    assert main_prod.find_openai_client("sk-valid") is not None
+
+
+class FakeWebClient:
+    def __init__(self, error: bool = False):
+        self.error = error
+        self.users_info_count = 0
+
+    def users_info(self, *, user: str, include_locale: bool):
+        self.users_info_count += 1
+        if self.error:
+            raise SlackApiError("ratelimited", {"ok": False, "error": "ratelimited"})
+        return {"ok": True, "user": {"id": user, "locale": "ja-JP"}}
+
+
+def build_locale_context() -> BoltContext:
+    context = BoltContext({"team_id": "T111", "user_id": "U111"})
+    context["authorize_result"] = AuthorizeResult(
+        enterprise_id=None, team_id="T111", bot_scopes=["users:read"]
+    )
+    return context
+
+
+def test_set_locale_cache_hit():
+    client = FakeWebClient()
+    for _ in range(2):
+        context = build_locale_context()
+        main_prod.set_locale(
+            context=context, client=client, logger=logger, next_=lambda: None
+        )
+        assert context["locale"] == "ja-JP"
+    assert client.users_info_count == 1
+
+
+def test_set_locale_cache_ttl(monkeypatch):
+    monkeypatch.setattr(main_prod, "LOCALE_CACHE_TTL_SECONDS", -1)
+    client = FakeWebClient()
+    for _ in range(2):
+        context = build_locale_context()
+        main_prod.set_locale(
+            context=context, client=client, logger=logger, next_=lambda: None
+        )
+        assert context["locale"] == "ja-JP"
+    assert client.users_info_count == 2
+
+
+def test_set_locale_error_is_not_cached():
+    client = FakeWebClient(error=True)
+    next_calls = []
+    context = build_locale_context()
+    main_prod.set_locale(
+        context=context,
+        client=client,
+        logger=logger,
+        next_=lambda: next_calls.append(True),
+    )
+    assert next_calls == [True]
+    assert context.get("locale") is None
+    assert main_prod._locale_cache == {}
+
+    client.error = False
+    context = build_locale_context()
+    main_prod.set_locale(
+        context=context, client=client, logger=logger, next_=lambda: None
+    )
+    assert context["locale"] == "ja-JP"
+    assert client.users_info_count == 2
+
+
+class FakeInstallationStore:
+    def __init__(self, error_method: Optional[str] = None):
+        self.error_method = error_method
+        self.calls = []
+
+    def _record(self, method: str, **kwargs):
+        self.calls.append((method, kwargs))
+        if method == self.error_method:
+            raise Exception(f"Failed to run {method}")
+
+    def delete_installation(self, **kwargs):
+        self._record("delete_installation", **kwargs)
+
+    def delete_bot(self, **kwargs):
+        self._record("delete_bot", **kwargs)
+
+    def delete_all(self, **kwargs):
+        self._record("delete_all", **kwargs)
+
+
+class FakeApp:
+    def __init__(self, installation_store: FakeInstallationStore):
+        self.installation_store = installation_store
+        self.listeners = {}
+
+    def event(self, event_type: str):
+        def register(ack, lazy):
+            self.listeners[event_type] = (ack, lazy)
+
+        return register
+
+
+def build_revocation_handlers(error_method: Optional[str] = None):
+    installation_store = FakeInstallationStore(error_method)
+    app = FakeApp(installation_store)
+    main_prod.register_revocation_handlers(app)
+    return app, installation_store
+
+
+@pytest.mark.parametrize(
+    "event_type, lazy_function_name",
+    [
+        ("tokens_revoked", "handle_tokens_revoked_events"),
+        ("app_uninstalled", "handle_app_uninstalled_events"),
+    ],
+)
+def test_revocation_handlers_registration(event_type, lazy_function_name):
+    request = BoltRequest(
+        body={
+            "type": "event_callback",
+            "team_id": "T111",
+            "event": {"type": event_type},
+        },
+        mode="socket_mode",
+    )
+    listeners = [
+        listener
+        for listener in main_prod.slack_handler.app._listeners
+        if listener.matches(req=request, resp=BoltResponse(status=200))
+    ]
+    assert len(listeners) == 1
+    assert listeners[0].ack_function is main_prod.just_ack
+    assert [f.__name__ for f in listeners[0].lazy_functions] == [lazy_function_name]
+
+
+def test_handle_tokens_revoked_events(monkeypatch):
+    s3_client = FakeS3Client()
+    monkeypatch.setattr(main_prod, "s3_client", s3_client)
+    app, installation_store = build_revocation_handlers()
+    ack, lazy = app.listeners["tokens_revoked"]
+    assert ack is main_prod.just_ack
+    lazy[0](
+        event={"tokens": {"oauth": ["U111", "U222"], "bot": ["W111"]}},
+        context=BoltContext({"team_id": "T111"}),
+        logger=logger,
+    )
+    assert sorted(
+        (method, kwargs.get("user_id")) for method, kwargs in installation_store.calls
+    ) == [
+        ("delete_bot", None),
+        ("delete_installation", "U111"),
+        ("delete_installation", "U222"),
+    ]
+    assert s3_client.delete_object_calls == [{"Bucket": "openai-bucket", "Key": "T111"}]
+
+
+def test_handle_tokens_revoked_events_without_tokens(monkeypatch):
+    s3_client = FakeS3Client()
+    monkeypatch.setattr(main_prod, "s3_client", s3_client)
+    app, installation_store = build_revocation_handlers()
+    _, lazy = app.listeners["tokens_revoked"]
+    lazy[0](event={}, context=BoltContext({"team_id": "T111"}), logger=logger)
+    assert installation_store.calls == []
+    assert s3_client.delete_object_calls == []
+
+
+def test_handle_app_uninstalled_events(monkeypatch):
+    s3_client = FakeS3Client()
+    monkeypatch.setattr(main_prod, "s3_client", s3_client)
+    app, installation_store = build_revocation_handlers()
+    ack, lazy = app.listeners["app_uninstalled"]
+    assert ack is main_prod.just_ack
+    lazy[0](context=BoltContext({"team_id": "T111"}), logger=logger)
+    assert [method for method, _ in installation_store.calls] == ["delete_all"]
+    assert s3_client.delete_object_calls == [{"Bucket": "openai-bucket", "Key": "T111"}]
+
+
+def test_handle_tokens_revoked_events_error(monkeypatch):
+    s3_client = FakeS3Client()
+    monkeypatch.setattr(main_prod, "s3_client", s3_client)
+    app, installation_store = build_revocation_handlers("delete_installation")
+    _, lazy = app.listeners["tokens_revoked"]
+    with pytest.raises(Exception, match="Failed to run delete_installation"):
+        lazy[0](
+            event={"tokens": {"oauth": ["U111"], "bot": ["W111"]}},
+            context=BoltContext({"team_id": "T111"}),
+            logger=logger,
+        )
+    # The other deletions still run before the error is raised
+    assert sorted(method for method, _ in installation_store.calls) == [
+        "delete_bot",
+        "delete_installation",
+    ]
+    assert s3_client.delete_object_calls == [{"Bucket": "openai-bucket", "Key": "T111"}]
+
+
+def test_handle_app_uninstalled_events_error(monkeypatch):
+    s3_client = FakeS3Client()
+    monkeypatch.setattr(main_prod, "s3_client", s3_client)
+    app, installation_store = build_revocation_handlers("delete_all")
+    _, lazy = app.listeners["app_uninstalled"]
+    with pytest.raises(Exception, match="Failed to run delete_all"):
+        lazy[0](context=BoltContext({"team_id": "T111"}), logger=logger)
+    assert s3_client.delete_object_calls == [{"Bucket": "openai-bucket", "Key": "T111"}]